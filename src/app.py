@@ -1,16 +1,110 @@
-import os
-import subprocess
+import collections
+import re
+import threading
+import time
 
-import pandas as pd
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
+from run_download import YouTubeDownloader, find_ffmpeg
+
+_YT_URL_RE = re.compile(
+    r"^https://(?:(?:www\.)?youtube\.com|youtu\.be|music\.youtube\.com)/"
+)
+
+
+class ProgressDisplay:
+    """
+    Show yt-dlp progress and log output in a single placeholder.
+
+    yt-dlp reports progress many times per second, so the page is only
+    refreshed at most every `interval` seconds instead of once per message.
+    """
+
+    def __init__(self, max_lines=200, interval=0.1):
+        self.progress_bar = st.progress(0.0)
+        self.placeholder = st.empty()
+        self.lines = collections.deque(maxlen=max_lines)
+        # Progress per entry, playlist entries are downloaded in parallel
+        self.fractions = {}
+        self.statuses = {}
+        self.interval = interval
+        self.last_refresh = 0.0
+        self.lock = threading.Lock()
+        # Playlist entries are downloaded from worker threads, which need the
+        # script context to be allowed to touch the page
+        self.ctx = get_script_run_ctx()
+
+    def progress_hook(self, d):
+        """yt-dlp progress hook."""
+        info = d.get("info_dict", {})
+        key = info.get("id") or d.get("filename")
+        total = d.get("total_bytes") or d.get("total_bytes_estimate")
+        with self.lock:
+            if d["status"] == "downloading" and total:
+                self.fractions[key] = min(d.get("downloaded_bytes", 0) / total, 1.0)
+            elif d["status"] == "finished":
+                self.fractions[key] = 1.0
+
+            if d["status"] == "downloading":
+                fraction = self.fractions.get(key, 0.0)
+                self.statuses[key] = f"{info.get('title', key)}: {fraction:.0%}"
+            else:
+                self.statuses.pop(key, None)
+        self.refresh()
+
+    def log(self, msg):
+        with self.lock:
+            self.lines.append(msg)
+        self.refresh()
+
+    # yt-dlp logger interface, regular output is sent through debug as well
+    def debug(self, msg):
+        if not msg.startswith("[debug] "):
+            self.log(msg)
+
+    def info(self, msg):
+        self.log(msg)
+
+    def warning(self, msg):
+        self.log(f"WARNING: {msg}")
+
+    def error(self, msg):
+        self.log(f"ERROR: {msg}")
+
+    def refresh(self, force=False):
+        """Redraw the page if the refresh interval has passed."""
+        with self.lock:
+            now = time.monotonic()
+            if not force and now - self.last_refresh < self.interval:
+                return
+            self.last_refresh = now
+            add_script_run_ctx(ctx=self.ctx)
+            fractions = self.fractions.values()
+            self.progress_bar.progress(
+                sum(fractions) / len(fractions) if fractions else 0.0
+            )
+            self.placeholder.code(
+                "\n".join([*self.lines, *self.statuses.values()]), language=None
+            )
 
-def run_and_display_stdout(*cmd_with_args):
-    result = subprocess.Popen(cmd_with_args, stdout=subprocess.PIPE)
-    for line in iter(lambda: result.stdout.readline(), b""):
-        st.text(line.decode("utf-8"))
-    # st.code(line.decode("utf-8"), language="bash")
-    # st.write_stream(iter(lambda: result.stdout.readline(), b""))
+
+def get_downloader(audio_format, quality):
+    """
+    Downloader reused across reruns of the current session.
+
+    Each session gets its own instance so downloads of different users run in
+    parallel. Changing the format or quality replaces (and closes) it.
+    """
+    key = (audio_format, quality)
+    downloader = st.session_state.get("downloader")
+    if st.session_state.get("downloader_key") != key:
+        if downloader is not None:
+            downloader.close()
+        downloader = YouTubeDownloader(audio_format=audio_format, quality=quality)
+        st.session_state.downloader = downloader
+        st.session_state.downloader_key = key
+    return downloader
 
 
 # Page config
@@ -50,8 +144,9 @@ with st.sidebar:
     if selected_format == "mp3":
         quality = st.selectbox(
             "MP3 Quality",
-            ["320k", "256k", "192k", "128k"],
+            ["320k", "256k", "192k", "128k", "0"],
             index=0,
+            format_func=lambda q: "V0 (VBR)" if q == "0" else q,
         )
     else:
         quality = "best"
@@ -78,19 +173,14 @@ url = st.text_input(
 if st.button("🎵 Download Audio", type="primary"):
     if not url:
         st.error("Please enter a YouTube URL")
+        st.stop()
 
-    if not url.startswith(
-        (
-            "https://www.youtube.com/",
-            "https://youtube.com/",
-            "https://youtu.be/",
-            "https://music.youtube",
-        )
-    ):
+    if not _YT_URL_RE.match(url):
         st.error("Please enter a valid YouTube URL")
+        st.stop()
 
     # Check if ffmpeg is available
-    if os.system("ffmpeg -version > /dev/null 2>&1") != 0:
+    if find_ffmpeg() is None:
         st.error(
             """
         **FFmpeg not found!**
@@ -101,22 +191,23 @@ if st.button("🎵 Download Audio", type="primary"):
         - **Windows**: Download from https://ffmpeg.org/download.html
         """
         )
+        st.stop()
 
     # Show progress
+    display = ProgressDisplay()
+
     with st.spinner("Processing download..."):
         try:
-            # Run the script file
-            run_and_display_stdout(
-                # Assuming path to python is in .venv
-                os.path.join(os.getcwd(), ".venv/bin/python/"),
-                "run_download.py",
-                "-f",
-                selected_format,
-                "-q",
-                quality,
-                f"{url}",
-            )
-            st.success("Download completed successfully!")
+            downloader = get_downloader(selected_format, quality)
+            with downloader.lock:
+                downloader.progress_hooks = [display.progress_hook]
+                downloader.logger = display
+                success = downloader.download([url])
+            display.refresh(force=True)
+            if success:
+                st.success("Download completed successfully!")
+            else:
+                st.error("Download failed, see the log above for details")
         except Exception as e:
             st.error(f"An error occurred: {str(e)}")
             raise e
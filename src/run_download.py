@@ -1,6 +1,12 @@
 import argparse
+import copy
 import os
+import shutil
+import subprocess
 import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from urllib.parse import parse_qs, urlparse
 
@@ -10,14 +16,63 @@ import yt_dlp
 DEFAULT_AUDIO_FORMAT = "mp3"
 DEFAULT_DOWNLOAD_DIR: str = os.path.join(os.getenv("HOME"), "Music/downloads")
 DEFAULT_QUALITY = "320k"
+DEFAULT_JOBS = 4
+DEFAULT_FRAGMENTS = 8
+
+
+# yt-dlp options shared by every downloader
+_BASE_OPTS = {
+    "format": "bestaudio/best",  # Download best quality audio
+    "extractaudio": True,
+    "http_chunk_size": 10 << 20,  # 10 MiB ranges keep the connection busy
+}
+
+# Let aria2c split large files over several connections if installed
+if shutil.which("aria2c"):
+    _BASE_OPTS["external_downloader"] = {"default": "aria2c"}
+    _BASE_OPTS["external_downloader_args"] = {
+        "aria2c": ["-x", "16", "-s", "16", "-k", "1M"]
+    }
+
+
+_ffmpeg_path = None
+
+
+def find_ffmpeg():
+    """Return the path to the ffmpeg executable, or None if it is not installed."""
+    global _ffmpeg_path
+    # Only remember a successful lookup, ffmpeg may be installed while the
+    # Streamlit server is running
+    if _ffmpeg_path is None:
+        _ffmpeg_path = shutil.which("ffmpeg")
+    return _ffmpeg_path
+
+
+def parse_mp3_quality(quality):
+    """
+    Parse an MP3 quality such as "320k", "320" or "0" into the number used by
+    yt-dlp's FFmpegExtractAudio: over 10 is a bitrate in kbps, otherwise a VBR
+    level. Raises ValueError for anything else.
+    """
+    value = float(str(quality).rstrip("kK"))
+    if value < 0:
+        raise ValueError(f"Invalid MP3 quality: {quality!r}")
+    return value
 
 
 class YouTubeDownloader:
+    # Maps characters that are invalid in filenames to "_"
+    _SANITIZE_TABLE = str.maketrans({char: "_" for char in '<>:"/\\|?*'})
+
     def __init__(
         self,
         output_dir=DEFAULT_DOWNLOAD_DIR,
         audio_format=DEFAULT_AUDIO_FORMAT,
         quality=DEFAULT_QUALITY,
+        jobs=DEFAULT_JOBS,
+        fragments=DEFAULT_FRAGMENTS,
+        progress_hooks=None,
+        logger=None,
     ):
         """
         Initialize the downloader.
@@ -25,112 +80,283 @@ class YouTubeDownloader:
         Args:
             output_dir (str): Directory to save files
             audio_format (str): Output format (wav, flac, mp3)
-            quality (str): Audio quality (320k, 256k, 192k for mp3; best for wav/flac)
+            quality (str): Audio quality (320k, 256k, 192k or 0 for V0 VBR mp3;
+                best for wav/flac)
+            jobs (int): Number of playlist entries to download in parallel
+            fragments (int): Number of DASH/HLS fragments to download in parallel
+            progress_hooks (list): Callables passed to yt-dlp's progress_hooks
+            logger: Object with debug/info/warning/error methods for yt-dlp output
+
+        progress_hooks and logger can be replaced between downloads, e.g. when the
+        instance is reused by the Streamlit app. Hold `lock` while doing so.
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
         self.audio_format = audio_format.lower()
         self.quality = quality
+        # Both FFmpegExtractAudio and the playlist converter get the plain number
+        self.mp3_quality = (
+            f"{parse_mp3_quality(quality):g}" if self.audio_format == "mp3" else None
+        )
+        self.jobs = max(1, jobs)
+        self.progress_hooks = list(progress_hooks or [])
+        self.logger = logger
+        self.lock = threading.Lock()
+        self._ydl = None
+        self._probe_ydl = None
 
         # Configure yt-dlp options for high-quality audio
         self.ydl_opts = {
-            "format": "bestaudio/best",  # Download best quality audio
-            "outtmpl": str(self.output_dir / "%(title)s.%(ext)s"),
-            "extractaudio": True,
+            **_BASE_OPTS,
+            "outtmpl": str(self.output_dir / "%(uploader)s - %(title)s.%(ext)s"),
             "audioformat": self.audio_format,
-            "audioquality": (
-                self.quality if self.audio_format == "mp3" else "0"
-            ),  # 0 = best for wav/flac
+            "audioquality": self.mp3_quality or "0",  # 0 = best for wav/flac
             "postprocessors": [
                 {
                     "key": "FFmpegExtractAudio",
                     "preferredcodec": self.audio_format,
-                    "preferredquality": (
-                        self.quality if self.audio_format == "mp3" else None
-                    ),
+                    "preferredquality": self.mp3_quality,  # None = lossless
                 }
             ],
-            "ffmpeg_location": None,  # Will use system ffmpeg
+            # yt-dlp looks these up by pp_key(), which drops the FFmpeg prefix
+            "postprocessor_args": {"extractaudio": self._ffmpeg_encoder_args()},
+            "ffmpeg_location": find_ffmpeg(),  # Skip yt-dlp's own PATH search
+            "concurrent_fragment_downloads": max(1, fragments),
         }
 
-        # Add format-specific options
-        if self.audio_format in ["wav", "flac"]:
-            self.ydl_opts["postprocessors"][0]["preferredquality"] = None  # Lossless
+    @property
+    def ydl(self):
+        """
+        YoutubeDL instance reused across downloads, so extractor state, cookies
+        and open HTTP connections survive between calls.
+        """
+        if self._ydl is None:
+            self._ydl = yt_dlp.YoutubeDL(self._build_opts())
+        self._sync_params(self._ydl)
+        return self._ydl
 
-        # Clean filename template
-        self.ydl_opts["outtmpl"] = str(
-            self.output_dir / "%(uploader)s - %(title)s.%(ext)s"
-        )
+    @property
+    def probe_ydl(self):
+        """
+        Reused YoutubeDL that only lists playlist entries (id, url, title) instead
+        of resolving the formats of every video.
+        """
+        if self._probe_ydl is None:
+            self._probe_ydl = yt_dlp.YoutubeDL(
+                self._build_opts(extract_flat="in_playlist", skip_download=True)
+            )
+        self._sync_params(self._probe_ydl)
+        return self._probe_ydl
+
+    def close(self):
+        """Close the reused YoutubeDL instances."""
+        for ydl in (self._ydl, self._probe_ydl):
+            if ydl is not None:
+                ydl.close()
+        self._ydl = None
+        self._probe_ydl = None
+
+    def _build_opts(self, **overrides):
+        """Return a fresh copy of the yt-dlp options for a new YoutubeDL."""
+        opts = copy.deepcopy(self.ydl_opts)
+        opts.update(overrides)
+        # Report progress and log output to the caller (e.g. the Streamlit app)
+        opts["progress_hooks"] = [self._progress_hook]
+        opts["logger"] = self.logger
+        opts["noprogress"] = bool(self.progress_hooks)
+        return opts
+
+    def _sync_params(self, ydl):
+        """Apply the current logger and progress settings to a reused YoutubeDL."""
+        # yt-dlp looks these up on every message
+        ydl.params["logger"] = self.logger
+        # The caller's progress hooks replace yt-dlp's own progress lines
+        ydl.params["noprogress"] = bool(self.progress_hooks)
+
+    def _log(self, msg, error=False):
+        """Print a message, or send it to the logger when one is set."""
+        if self.logger is None:
+            print(msg)
+        elif error:
+            self.logger.error(msg)
+        else:
+            self.logger.info(msg)
+
+    def _progress_hook(self, d):
+        for hook in self.progress_hooks:
+            hook(d)
 
     def sanitize_filename(self, filename):
         """Remove invalid characters from filename."""
-        invalid_chars = '<>:"/\\|?*'
-        for char in invalid_chars:
-            filename = filename.replace(char, "_")
-        return filename
+        return filename.translate(self._SANITIZE_TABLE)
 
     def download_single_video(self, url):
         """Download a single YouTube video as audio."""
         try:
-            with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-                # Get video info first
-                info = ydl.extract_info(url, download=False)
-                title = info.get("title", "Unknown")
-                uploader = info.get("uploader", "Unknown")
-                duration = info.get("duration", 0)
-
-                print(f"Title: {title}")
-                print(f"Uploader: {uploader}")
-                print(f"Duration: {duration // 60}:{duration % 60:02d}")
-                print(f"Downloading...")
-
-                # Download and convert
-                ydl.download([url])
-                print(f"✓ Successfully downloaded: {title}")
-                return True
+            # Download and convert, reusing the extracted info for the summary
+            # instead of extracting the video twice
+            self._log(f"Downloading...")
+            info = self.ydl.extract_info(url, download=True)
+            title = info.get("title", "Unknown")
+            uploader = info.get("uploader", "Unknown")
+            duration = int(info.get("duration") or 0)
+
+            self._log(f"Title: {title}")
+            self._log(f"Uploader: {uploader}")
+            self._log(f"Duration: {duration // 60}:{duration % 60:02d}")
+            self._log(f"✓ Successfully downloaded: {title}")
+            return True
 
         except Exception as e:
-            print(f"✗ Error downloading {url}: {str(e)}")
+            self._log(f"✗ Error downloading {url}: {str(e)}", error=True)
             return False
 
     def download_playlist(self, url):
         """Download all videos from a YouTube playlist."""
-        playlist_opts = self.ydl_opts.copy()
-        playlist_opts["extract_flat"] = False
-
         try:
-            with yt_dlp.YoutubeDL(playlist_opts) as ydl:
-                # Get playlist info
-                info = ydl.extract_info(url, download=False)
-                playlist_title = info.get("title", "Unknown Playlist")
-                entries = info.get("entries", [])
-
-                print(f"Playlist: {playlist_title}")
-                print(f"Found {len(entries)} videos")
-                print("-" * 50)
-
-                # Create playlist subdirectory
-                playlist_dir = self.output_dir / self.sanitize_filename(playlist_title)
-                playlist_dir.mkdir(exist_ok=True)
-
-                # Update output template for playlist
+            # Get playlist info, entries are resolved by the download workers
+            info = self.probe_ydl.extract_info(url, download=False)
+            playlist_title = info.get("title", "Unknown Playlist")
+            entries = [entry for entry in info.get("entries", []) if entry]
+
+            self._log(f"Playlist: {playlist_title}")
+            self._log(f"Found {len(entries)} videos")
+            self._log("-" * 50)
+
+            # Create playlist subdirectory
+            playlist_dir = self.output_dir / self.sanitize_filename(playlist_title)
+            playlist_dir.mkdir(exist_ok=True)
+
+            # Download entries in parallel, yt-dlp itself handles them serially
+            jobs = [
+                (
+                    entry.get("webpage_url") or entry["url"],
+                    entry.get("playlist_index") or index,
+                )
+                for index, entry in enumerate(entries, 1)
+            ]
+            if not jobs:
+                self._log("✗ Playlist is empty", error=True)
+                return False
+
+            playlist_opts = self._build_opts()
+            with tempfile.TemporaryDirectory() as tmp_dir, ThreadPoolExecutor(
+                max_workers=os.cpu_count()
+            ) as converter:
+                conversions = []
+
+                def on_downloaded(filepath):
+                    # Convert as soon as yt-dlp is done with an entry (including
+                    # its fixups), so FFmpeg runs while the remaining entries
+                    # are still downloading
+                    conversions.append(
+                        converter.submit(self._convert_audio, filepath, playlist_dir)
+                    )
+
+                # Only fetch the raw audio here, conversion is done by the
+                # converter pool instead of yt-dlp's serial postprocessor
                 playlist_opts["outtmpl"] = str(
-                    playlist_dir
+                    Path(tmp_dir)
                     / "%(playlist_index)02d - %(title)s.%(ext)s"  # Numbered format
-                    # playlist_dir / "%(title)s.%(ext)s" # Non-numbered format
+                    # Path(tmp_dir) / "%(title)s.%(ext)s" # Non-numbered format
                 )
+                playlist_opts["postprocessors"] = []
+                playlist_opts["keepvideo"] = False
+                playlist_opts["post_hooks"] = [on_downloaded]
+
+                # One YoutubeDL per worker thread, reused for all of its entries
+                # so its extractors and HTTP connections stay warm
+                workers = threading.local()
+                instances = []
+
+                def worker_ydl():
+                    if not hasattr(workers, "ydl"):
+                        workers.ydl = yt_dlp.YoutubeDL(dict(playlist_opts))
+                        instances.append(workers.ydl)
+                    return workers.ydl
+
+                try:
+                    with ThreadPoolExecutor(
+                        max_workers=min(self.jobs, len(jobs))
+                    ) as ex:
+                        results = list(
+                            ex.map(
+                                lambda job: self._download_playlist_entry(
+                                    worker_ydl(), *job
+                                ),
+                                jobs,
+                            )
+                        )
+                finally:
+                    for ydl in instances:
+                        ydl.close()
+                converted = [future.result() for future in conversions]
+
+            self._log(
+                f"✓ Playlist download complete! ({sum(converted)}/{len(jobs)})"
+            )
+            return all(results) and all(converted)
 
-                # Download playlist
-                with yt_dlp.YoutubeDL(playlist_opts) as playlist_ydl:
-                    playlist_ydl.download([url])
+        except Exception as e:
+            self._log(
+                f"✗ Error downloading playlist {url}: {str(e)}", error=True
+            )
+            return False
 
-                print(f"✓ Playlist download complete!")
-                return True
+    def _download_playlist_entry(self, ydl, url, index):
+        """Download a single playlist entry with the worker's YoutubeDL instance."""
+        try:
+            # playlist_index is not set when downloading the entry on its own
+            ydl.extract_info(url, extra_info={"playlist_index": index})
+            return True
 
         except Exception as e:
-            print(f"✗ Error downloading playlist {url}: {str(e)}")
+            self._log(f"✗ Error downloading {url}: {str(e)}", error=True)
+            return False
+
+    def _convert_audio(self, src, dest_dir):
+        """Convert a downloaded file to the target audio format with FFmpeg."""
+        src = Path(src)
+        dest = Path(dest_dir) / f"{src.stem}.{self.audio_format}"
+        if self.audio_format == "mp3":
+            # Same rules as yt-dlp's FFmpegExtractAudio: values over 10 are a
+            # bitrate in kbps, lower values a VBR level
+            if float(self.mp3_quality) > 10:
+                codec_args = ["-c:a", "libmp3lame", "-b:a", f"{self.mp3_quality}k"]
+            else:
+                codec_args = ["-c:a", "libmp3lame", "-q:a", self.mp3_quality]
+        else:
+            codec_args = {
+                "flac": ["-c:a", "flac"],
+                "wav": ["-c:a", "pcm_s16le"],
+            }[self.audio_format]
+        ffmpeg = find_ffmpeg() or "ffmpeg"
+        cmd = [ffmpeg, "-y", "-loglevel", "error", "-i", str(src), "-vn"]
+
+        result = subprocess.run(
+            [*cmd, *codec_args, *self._ffmpeg_encoder_args(), str(dest)],
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+        if result.returncode != 0:
+            self._log(
+                f"✗ Error converting {src.name}: {result.stderr.strip()}", error=True
+            )
             return False
 
+        src.unlink(missing_ok=True)
+        self._log(f"✓ Converted: {dest.name}")
+        return True
+
+    def _ffmpeg_encoder_args(self):
+        """Extra FFmpeg encoder arguments shared by both conversion paths."""
+        if self.audio_format == "flac":
+            # Level 5 is already FFmpeg's default, this only pins it
+            return ["-compression_level", "5"]
+        return []
+
     def is_playlist(self, url):
         """Check if URL is a playlist."""
         parsed_url = urlparse(url)
@@ -146,7 +372,7 @@ class YouTubeDownloader:
         total = len(urls)
 
         for i, url in enumerate(urls, 1):
-            print(f"\n[{i}/{total}] Processing: {url}")
+            self._log(f"\n[{i}/{total}] Processing: {url}")
 
             if self.is_playlist(url):
                 success = self.download_playlist(url)
@@ -156,9 +382,21 @@ class YouTubeDownloader:
             if success:
                 successful += 1
 
-        print(f"\n" + "=" * 50)
-        print(f"Download Summary: {successful}/{total} successful")
-        print(f"Files saved to: {self.output_dir.absolute()}")
+        self._log(f"\n" + "=" * 50)
+        self._log(f"Download Summary: {successful}/{total} successful")
+        self._log(f"Files saved to: {self.output_dir.absolute()}")
+        return successful
+
+
+def _mp3_quality_arg(value):
+    """argparse type for -q, checks the value without changing it."""
+    try:
+        parse_mp3_quality(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid MP3 quality {value!r}, use a bitrate such as 320k or 0-10 for VBR"
+        )
+    return value
 
 
 def parse_arguments():
@@ -182,8 +420,24 @@ def parse_arguments():
     parser.add_argument(
         "-q",
         "--quality",
+        type=_mp3_quality_arg,
         default=DEFAULT_QUALITY,
-        help="Audio quality for MP3 (default: 320k). Ignored for WAV/FLAC.",
+        help="Audio quality for MP3, a bitrate or 0 for V0 VBR (default: 320k). "
+        "Ignored for WAV/FLAC.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Playlist entries to download in parallel (default: {DEFAULT_JOBS})",
+    )
+    parser.add_argument(
+        "-N",
+        "--concurrent-fragments",
+        type=int,
+        default=DEFAULT_FRAGMENTS,
+        help=f"DASH/HLS fragments to download in parallel (default: {DEFAULT_FRAGMENTS})",
     )
     return parser.parse_args()
 
@@ -193,7 +447,7 @@ def main():
     args = parse_arguments()
 
     # Check if ffmpeg is available
-    if os.system("ffmpeg -version > /dev/null 2>&1") != 0:
+    if find_ffmpeg() is None:
         print("Error: ffmpeg not found. Please install ffmpeg first.")
         print("On Ubuntu/Debian: sudo apt install ffmpeg")
         print("On macOS: brew install ffmpeg")
@@ -202,7 +456,11 @@ def main():
 
     # Initialize downloader
     downloader = YouTubeDownloader(
-        output_dir=args.output, audio_format=args.format, quality=args.quality
+        output_dir=args.output,
+        audio_format=args.format,
+        quality=args.quality,
+        jobs=args.jobs,
+        fragments=args.concurrent_fragments,
     )
 
     # Download